@@ -4,52 +4,411 @@ import json
 import logging
 import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import base64
+import io
 import shutil
 import re
-import difflib
+import bisect
+import orjson
+from cachetools import TTLCache
 import requests
-from pathlib import Path
-from flask import Flask, request, jsonify, render_template
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rapidfuzz import fuzz
+import imagehash
+import numpy as np
+from PIL import Image
+from flask import Flask, Response, request, jsonify, render_template
+from flask.json.provider import JSONProvider
 from spellchecker import SpellChecker
 
 # Suppress noisy Werkzeug request logs
 logging.getLogger("werkzeug").setLevel(logging.ERROR)
 
-# One shared spell-checker instance (English only)
+# One shared spell-checker instance (English only). Lookups go straight to
+# its word→frequency dict; words far longer than any dictionary entry are
+# skipped, as SpellChecker.unknown does.
 _spell = SpellChecker()
+_DICTIONARY = _spell.word_frequency.dictionary
+_MAX_CHECKED_LEN = _spell.word_frequency.longest_word_length + 3
+
+
+class OrjsonProvider(JSONProvider):
+    """Serve jsonify() responses through orjson — /status is hit constantly."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config["MAX_CONTENT_LENGTH"] = 500 * 1024 * 1024  # 500 MB
 
-# In-memory job store
-jobs = {}
+# ──────────────────────────────────────────────
+# Job store
+# ──────────────────────────────────────────────
+
+# Finished jobs are kept this long after their last update, then dropped.
+# Queued and running jobs never expire in memory. In Redis they get a
+# generous safety expiry, refreshed on every update, so a job orphaned by a
+# dead worker or a redeploy doesn't stay "processing" forever.
+JOB_TTL_SECONDS = 3600
+ACTIVE_JOB_TTL_SECONDS = 6 * 3600
+MAX_JOBS = 1024
+FINISHED_STATUSES = ("done", "error")
+
+
+class MemoryJobStore:
+    """
+    In-process job store. Active jobs are held until they finish; finished
+    ones move to a cache bounded to MAX_JOBS entries that expire
+    JOB_TTL_SECONDS later. Only correct with a single app process — each
+    Gunicorn worker would otherwise see its own copy.
+    """
+
+    def __init__(self):
+        self._active = {}
+        self._finished = TTLCache(maxsize=MAX_JOBS, ttl=JOB_TTL_SECONDS)
+        self._cond = threading.Condition()
+
+    def _lookup(self, job_id: str):
+        job = self._active.get(job_id)
+        return job if job is not None else self._finished.get(job_id)
+
+    def create(self, job_id: str, job: dict) -> None:
+        with self._cond:
+            self._active[job_id] = {**job, "version": 0}
+            self._cond.notify_all()
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._cond:
+            job = self._lookup(job_id)
+            if job is None:  # finished and expired — nobody can ask for it any more
+                return
+            job.update(fields)
+            job["version"] += 1
+            if job["status"] in FINISHED_STATUSES:
+                self._active.pop(job_id, None)
+                self._finished[job_id] = job  # (re-)insert to start its TTL
+            self._cond.notify_all()
+
+    def get(self, job_id: str):
+        with self._cond:
+            job = self._lookup(job_id)
+            return dict(job) if job is not None else None
+
+    def watch(self, job_id: str, timeout: float = 15):
+        """Yield a job snapshot on every change, or None after `timeout` idle seconds."""
+        last = None
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: (self._lookup(job_id) or {}).get("version") != last, timeout=timeout,
+                )
+                job = self._lookup(job_id)
+                job = dict(job) if job is not None else None
+            if job is None:
+                return
+            if job["version"] == last:
+                yield None
+                continue
+            last = job["version"]
+            yield job
+
+
+class RedisJobStore:
+    """
+    Job store shared by every app process through Redis. Each job is a hash
+    of JSON-encoded (orjson) fields; changes are announced on a per-job pub/sub channel.
+    """
+
+    _JSON_FIELDS = ("status", "progress", "results", "error")
+
+    def __init__(self, url: str):
+        import redis
+        self._r = redis.Redis.from_url(url)
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def create(self, job_id: str, job: dict) -> None:
+        mapping = {k: orjson.dumps(v) for k, v in job.items()}
+        mapping["version"] = 0
+        pipe = self._r.pipeline()
+        pipe.hset(self._key(job_id), mapping=mapping)
+        pipe.expire(self._key(job_id), ACTIVE_JOB_TTL_SECONDS)
+        pipe.publish(self._key(job_id), 0)
+        pipe.execute()
+
+    def update(self, job_id: str, **fields) -> None:
+        key = self._key(job_id)
+        mapping = {k: orjson.dumps(v) for k, v in fields.items()}
+
+        def apply(pipe):
+            # WATCHed, so the job can't expire between this check and EXEC
+            if not pipe.exists(key):  # finished and expired — don't recreate a partial hash
+                return
+            pipe.multi()
+            pipe.hset(key, mapping=mapping)
+            pipe.hincrby(key, "version", 1)
+            finished = fields.get("status") in FINISHED_STATUSES
+            pipe.expire(key, JOB_TTL_SECONDS if finished else ACTIVE_JOB_TTL_SECONDS)
+
+        replies = self._r.transaction(apply, key)
+        if replies:
+            self._r.publish(key, replies[1])
+
+    def get(self, job_id: str):
+        raw = self._r.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        job = {k.decode(): v for k, v in raw.items()}
+        for field in self._JSON_FIELDS:
+            if field in job:
+                job[field] = orjson.loads(job[field])
+        job["version"] = int(job["version"])
+        return job
+
+    def watch(self, job_id: str, timeout: float = 15):
+        """Yield a job snapshot on every change, or None after `timeout` idle seconds."""
+        pubsub = self._r.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._key(job_id))  # subscribe before the first read so no update is missed
+        try:
+            job = self.get(job_id)
+            if job is None:
+                return
+            yield job
+            while True:
+                message = pubsub.get_message(timeout=timeout)
+                if message is None:
+                    yield None
+                    continue
+                job = self.get(job_id)
+                if job is None:
+                    return
+                yield job
+        finally:
+            pubsub.close()
+
+
+def _make_job_store():
+    """Use Redis when REDIS_URL is set (required for multi-worker deployments)."""
+    url = os.environ.get("REDIS_URL")
+    return RedisJobStore(url) if url else MemoryJobStore()
+
+
+jobs = _make_job_store()
+
 
 # ──────────────────────────────────────────────
 # Ollama config
 # ──────────────────────────────────────────────
 OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL    = os.environ.get("OLLAMA_MODEL",    "video-spellcheck")
-
-# Whisper model (lazy-loaded on first transcription)
+# Keep the model (and its prompt-prefix KV cache) resident between frames
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# Concurrent frame requests — match the server's OLLAMA_NUM_PARALLEL
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+
+# Shared HTTP session: keep-alive connections to Ollama are reused across
+# frames, worker threads and jobs instead of reconnecting per request.
+# Ollama answers 503 when its request queue is full, so retry briefly. Read
+# timeouts are not retried: a hung request already used its full timeout.
+_RETRY = Retry(
+    total=2,
+    read=False,
+    backoff_factor=0.2,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=["GET", "POST"],
+)
+_SESSION = requests.Session()
+_SESSION.headers["Connection"] = "keep-alive"
+_SESSION.mount("http://",  HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=_RETRY))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=_RETRY))
+
+# One pool of frame-request threads shared by every job, so the number of
+# in-flight Ollama calls stays at OLLAMA_NUM_PARALLEL however many jobs run
+_ANALYZE_POOL = ThreadPoolExecutor(max_workers=OLLAMA_NUM_PARALLEL, thread_name_prefix="ollama")
+
+# Whisper model (lazy-loaded on first transcription, shared by all jobs in this process)
 _whisper_model = None
+_whisper_lock  = threading.Lock()
+# 1 = greedy decoding; raise for slightly better transcripts at more CPU cost
+WHISPER_BEAM_SIZE = int(os.environ.get("WHISPER_BEAM_SIZE", "1"))
 
 
 # ──────────────────────────────────────────────
 # Helpers — frames
 # ──────────────────────────────────────────────
 
-def extract_frames(video_path: str, output_dir: str, fps: float = 0.5) -> list:
-    """Extract one frame every 2 seconds from the video."""
-    os.makedirs(output_dir, exist_ok=True)
-    cmd = [
-        "ffmpeg", "-i", video_path,
-        "-vf", f"fps={fps}",
-        os.path.join(output_dir, "frame_%04d.jpg"),
-        "-y", "-loglevel", "error",
+# llama3.2-vision reads images as up to 2×2 tiles of 560 px; anything larger
+# only adds upload bytes and vision-encoder work without helping OCR. Applies
+# to the longest edge so portrait (9:16) video is capped too.
+FRAME_MAX_EDGE = int(os.environ.get("FRAME_MAX_EDGE", "1120"))
+
+# Sample one frame every 2 seconds
+FRAME_FPS = 0.5
+
+# Decode only key frames (much faster on long videos, but a caption that
+# appears and disappears between two key frames is missed). Off by default.
+FRAME_KEYFRAMES_ONLY = os.environ.get("FRAME_KEYFRAMES_ONLY", "0") == "1"
+
+# Two frames count as the same only if, compared as grayscale at DEDUPE_EDGE
+# px on the longest edge, at most DEDUPE_MAX_CHANGED pixels differ by more
+# than DEDUPE_PIXEL_DELTA levels. A whole-frame pHash can't be used for this:
+# a new caption over the same background barely moves it. This threshold
+# still treats a one-letter caption change as a new frame while absorbing
+# JPEG noise.
+DEDUPE_EDGE = 560
+DEDUPE_PIXEL_DELTA = 32
+DEDUPE_MAX_CHANGED = 8
+
+# A frame may reuse the result of an earlier analysed (non-adjacent) frame.
+# The pHash only narrows the candidates, since frames with different captions
+# can share one. A candidate is reused only if it also passes the pixel check
+# above. At most this many of the most recent candidates are checked.
+DEDUPE_REUSE_CANDIDATES = 8
+
+
+def extract_frames(video_path: str, fps: float = FRAME_FPS, keyframes_only: bool = FRAME_KEYFRAMES_ONLY) -> list:
+    """
+    Extract one frame every 2 seconds from the video as in-memory JPEG bytes.
+    Audio/subtitle streams are skipped and decoding uses every core; with
+    keyframes_only=True the decoder skips every non-key frame entirely.
+    """
+    # -threads before -i sizes the decoder, after it the filter/encoder
+    cmd = ["ffmpeg", "-hwaccel", "auto", "-threads", "0"]
+    if keyframes_only:
+        cmd += ["-skip_frame", "nokey"]
+    cmd += [
+        "-i", video_path,
+        "-an", "-sn",
+        "-vf", (
+            f"fps={fps},"
+            f"scale='min({FRAME_MAX_EDGE},iw)':'min({FRAME_MAX_EDGE},ih)'"
+            ":force_original_aspect_ratio=decrease:force_divisible_by=2"
+        ),
+        "-q:v", "6",
+        "-threads", "0",
+        "-f", "image2pipe", "-c:v", "mjpeg",
+        "-loglevel", "error", "-",
     ]
-    subprocess.run(cmd, capture_output=True, text=True)
-    return sorted(Path(output_dir).glob("frame_*.jpg"))
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+        return list(_iter_jpegs(proc.stdout))
+
+
+def _iter_jpegs(stream, chunk_size: int = 1024 * 1024):
+    """
+    Yield individual JPEGs (SOI … EOI) from an MJPEG byte stream as they
+    arrive, so the whole stream is never buffered at once.
+    """
+    buf = bytearray()
+    scan_from = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        buf += chunk
+        while True:
+            start = buf.find(b"\xff\xd8")
+            if start == -1:
+                del buf[:-1]  # keep a trailing 0xFF in case SOI straddles chunks
+                scan_from = 0
+                break
+            # 0xFF is byte-stuffed inside entropy-coded data, so the first EOI
+            # marker after SOI always ends the image
+            end = buf.find(b"\xff\xd9", max(start + 2, scan_from))
+            if end == -1:
+                del buf[:start]
+                scan_from = max(len(buf) - 1, 2)  # EOI may straddle chunks
+                break
+            yield bytes(buf[start:end + 2])
+            del buf[:end + 2]
+            scan_from = 0
+
+
+def frame_signature(jpeg: bytes) -> tuple:
+    """
+    Return (pHash, grayscale thumbnail) for a frame. The pHash only groups
+    candidates for reuse; the thumbnail decides whether two frames match.
+    """
+    with Image.open(io.BytesIO(jpeg)) as img:
+        scale = DEDUPE_EDGE / max(img.size)
+        img.draft("L", (int(img.width * scale), int(img.height * scale)))  # cheap DCT downscale
+        thumb = img.convert("L")
+    thumb.thumbnail((DEDUPE_EDGE, DEDUPE_EDGE), Image.BOX)
+    return imagehash.phash(thumb), np.asarray(thumb)
+
+
+def _same_frame(a, b) -> bool:
+    if a.shape != b.shape:
+        return False
+    changed = np.count_nonzero(np.abs(a.astype(np.int16) - b) > DEDUPE_PIXEL_DELTA)
+    return changed <= DEDUPE_MAX_CHANGED
+
+
+def dedupe_frames(signatures: list) -> list:
+    """
+    For each frame, return the index of the frame whose analysis it can reuse:
+    the last kept frame if it matches it, an earlier kept frame it matches (a
+    caption card shown again later), or itself.
+    """
+    sources = []
+    kept_by_hash = {}
+    last_kept = None
+    for i, (h, thumb) in enumerate(signatures):
+        if last_kept is None or not _same_frame(thumb, signatures[last_kept][1]):
+            candidates = kept_by_hash.setdefault(h, [])
+            last_kept = next(
+                (k for k in reversed(candidates[-DEDUPE_REUSE_CANDIDATES:])
+                 if _same_frame(thumb, signatures[k][1])),
+                i,
+            )
+            if last_kept == i:
+                candidates.append(i)
+        sources.append(last_kept)
+    return sources
+
+
+# Optional text pre-filter: with OpenCV installed, frames that show no
+# character-like regions skip the Ollama call. SKIP_EMPTY=0 turns it off.
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+SKIP_EMPTY = os.environ.get("SKIP_EMPTY", "1") == "1"
+
+# Smears neighbouring glyph edges into one blob per line of text
+_TEXT_LINE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3)) if cv2 else None
+
+
+def probably_has_text(jpeg: bytes) -> bool:
+    """
+    Cheap Canny + contour check for a caption-like line of text: a blob of
+    edges at least 8 px high and wider than it is high. The check is
+    repeated on a quarter-size copy, where the letters of large title text
+    are close enough to merge into a line. Errs on the side of True —
+    textured scenes also pass.
+    """
+    if cv2 is None or not SKIP_EMPTY:
+        return True
+    gray = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return True
+    small = cv2.resize(gray, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+    for img in (gray, small):
+        edges = cv2.morphologyEx(cv2.Canny(img, 100, 200), cv2.MORPH_CLOSE, _TEXT_LINE_KERNEL)
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            _x, _y, w, h = cv2.boundingRect(contour)
+            if h >= 8 and w > h:
+                return True
+    return False
 
 
 # ── Echo detection: model returned prompt text instead of reading the image
@@ -60,91 +419,174 @@ _ECHO_MARKERS = [
     "on-screen text", "misspelled", "surrounding words",
 ]
 
+# Single-pass multi-pattern match: Aho-Corasick automaton when pyahocorasick
+# is installed, otherwise one compiled regex alternation (inside a lookahead,
+# so markers that overlap — "reply with" / "reply in json" — are all found).
+try:
+    import ahocorasick
+    _ECHO_AUTOMATON = ahocorasick.Automaton()
+    for _m in _ECHO_MARKERS:
+        _ECHO_AUTOMATON.add_word(_m, _m)
+    _ECHO_AUTOMATON.make_automaton()
+
+    def _echo_hits(t: str) -> set:
+        return {m for _, m in _ECHO_AUTOMATON.iter(t)}
+except ImportError:
+    _ECHO_RE = re.compile("(?=(" + "|".join(map(re.escape, _ECHO_MARKERS)) + "))")
+
+    def _echo_hits(t: str) -> set:
+        return set(_ECHO_RE.findall(t))
+
 def _is_echo(text: str) -> bool:
     if not text:
         return False
-    t = text.lower()
-    return sum(1 for m in _ECHO_MARKERS if m in t) >= 2
+    return len(_echo_hits(text.lower())) >= 2
 
 
+_NON_ALPHA = re.compile(r"[^a-z]")
+
 def _validate_errors(errors: list) -> list:
     """For English: cross-check with pyspellchecker to remove false positives."""
     if not errors:
         return []
     confirmed = []
     for err in errors:
-        word = re.sub(r"[^a-z]", "", err.get("word", "").lower())
-        if not word:
-            continue
-        if _spell.unknown([word]):
+        word = _NON_ALPHA.sub("", err.get("word", "").lower())
+        if word and word not in _DICTIONARY and len(word) <= _MAX_CHECKED_LEN:
             confirmed.append(err)
     return confirmed
 
 
-def analyze_frame(frame_path: str, frame_index: int, language: str = "english", fps: float = 0.5) -> dict:
-    """Send a single frame to Ollama and return on-screen text + spelling errors."""
-    with open(frame_path, "rb") as f:
-        image_b64 = base64.standard_b64encode(f.read()).decode("utf-8")
-
-    timestamp_sec = round(frame_index / fps)
-
-    # Language-aware prompt
-    if language == "hinglish":
-        user_msg = (
-            "What text is shown on screen? Are there any spelling errors? "
-            "This video uses Hinglish — Hindi words written in Roman/English script. "
-            "Words like 'kya', 'hai', 'nahi', 'bhai', 'yaar', 'aur', 'bhi', 'toh', 'matlab' "
-            "are correctly spelled Hinglish and must NOT be flagged as errors."
-        )
-    else:
-        user_msg = "What text is shown on screen? Are there any spelling errors?"
-
-    _format = {
-        "type": "object",
-        "properties": {
-            "text":   {"type": ["string", "null"]},
-            "errors": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "word":       {"type": "string"},
-                        "suggestion": {"type": "string"},
-                    },
-                    "required": ["word", "suggestion"],
+# Fixed per-language user messages. Every frame request shares the same
+# system prompt (Modelfile) + user text and differs only in the image, so
+# Ollama can reuse the prompt-prefix KV cache from one frame to the next.
+_USER_MSGS = {
+    "english": "What text is shown on screen? Are there any spelling errors?",
+    "hinglish": (
+        "What text is shown on screen? Are there any spelling errors? "
+        "This video uses Hinglish — Hindi words written in Roman/English script. "
+        "Words like 'kya', 'hai', 'nahi', 'bhai', 'yaar', 'aur', 'bhi', 'toh', 'matlab' "
+        "are correctly spelled Hinglish and must NOT be flagged as errors."
+    ),
+}
+
+
+# Structured-output schema sent with every frame — kept constant so the
+# request prefix never changes between calls.
+_FORMAT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "text":   {"type": ["string", "null"]},
+        "errors": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "word":       {"type": "string"},
+                    "suggestion": {"type": "string"},
                 },
+                "required": ["word", "suggestion"],
             },
         },
-        "required": ["text", "errors"],
-    }
+    },
+    "required": ["text", "errors"],
+}
+
+
+# Greedy decoding for short structured replies; num_predict bounds the worst
+# case when the model rambles (a full caption + errors fits well within it).
+_OLLAMA_OPTIONS = {
+    "temperature": 0,
+    "top_k":       1,
+    "num_predict": 512,
+    "num_ctx":     4096,
+}
+
 
+# Fallback for replies that aren't bare JSON (```json fences, prose around
+# the object): decode the first object in place and ignore whatever follows
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _parse_reply(raw: str) -> dict:
+    """Parse the model's reply. The format schema makes it bare JSON in practice."""
     try:
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/chat",
-            json={
-                "model": OLLAMA_MODEL,
-                "messages": [
-                    {"role": "user", "content": user_msg, "images": [image_b64]},
-                ],
-                "format": _format,
-                "stream": False,
-            },
-            timeout=120,
+        result = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        start = raw.find("{")
+        try:
+            result = _JSON_DECODER.raw_decode(raw, start)[0] if start != -1 else None
+        except ValueError:
+            result = None
+    return result if isinstance(result, dict) else {"text": None, "errors": []}
+
+
+def _ollama_chat(user_msg: str, image_b64: str, fmt: dict) -> str:
+    """
+    POST one frame to Ollama's /api/chat and return the raw reply content.
+    llama3.2-vision accepts a single image per request, so frames are not
+    packed together; instead the message prefix is kept identical across
+    calls and keep_alive pins the model between them.
+    """
+    response = _SESSION.post(
+        f"{OLLAMA_BASE_URL}/api/chat",
+        json={
+            "model": OLLAMA_MODEL,
+            "messages": [
+                {"role": "user", "content": user_msg, "images": [image_b64]},
+            ],
+            "format": fmt,
+            "options": _OLLAMA_OPTIONS,
+            "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+        },
+        timeout=120,
+    )
+    response.raise_for_status()
+    return response.json().get("message", {}).get("content", "").strip()
+
+
+def warm_up_model() -> None:
+    """
+    Ask Ollama to load the model (an empty /api/generate does only that), so
+    the load overlaps audio and frame extraction instead of stalling the
+    first frame request.
+    """
+    try:
+        _SESSION.post(
+            f"{OLLAMA_BASE_URL}/api/generate",
+            json={"model": OLLAMA_MODEL, "keep_alive": OLLAMA_KEEP_ALIVE},
+            timeout=300,
         )
-        response.raise_for_status()
-        raw = response.json().get("message", {}).get("content", "").strip()
-    except Exception:
-        raw = ""
+    except requests.RequestException:
+        pass  # the frame requests will surface any real problem
+
+
+# SIMD base64 when pybase64 is installed, otherwise the stdlib codec.
+try:
+    from pybase64 import b64encode_as_string as _b64encode
+except ImportError:
+    def _b64encode(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+
+def encode_frame(jpeg: bytes) -> str:
+    """Return a frame JPEG base64-encoded for the Ollama API."""
+    return _b64encode(jpeg)
 
-    raw = re.sub(r"^```(?:json)?\s*", "", raw)
-    raw = re.sub(r"\s*```$", "", raw)
-    m = re.search(r'\{.*\}', raw, re.DOTALL)
-    raw = m.group(0) if m else ""
+
+def analyze_frame(image_b64: str, frame_index: int, language: str = "english", fps: float = FRAME_FPS) -> dict:
+    """Send a single base64-encoded frame to Ollama and return on-screen text + spelling errors."""
+    timestamp_sec = round(frame_index / fps)
+
+    user_msg = _USER_MSGS.get(language, _USER_MSGS["english"])
 
     try:
-        result = json.loads(raw)
+        raw = _ollama_chat(user_msg, image_b64, _FORMAT_SCHEMA)
     except Exception:
-        result = {"text": None, "errors": []}
+        raw = ""
+
+    result = _parse_reply(raw)
 
     if _is_echo(str(result.get("text") or "")):
         result = {"text": None, "errors": []}
@@ -167,9 +609,12 @@ def analyze_frame(frame_path: str, frame_index: int, language: str = "english",
 def _get_whisper_model():
     """Lazy-load faster-whisper model (downloads ~480 MB on first use)."""
     global _whisper_model
-    if _whisper_model is None:
-        from faster_whisper import WhisperModel
-        _whisper_model = WhisperModel("small", device="cpu", compute_type="int8")
+    with _whisper_lock:
+        if _whisper_model is None:
+            from faster_whisper import WhisperModel
+            _whisper_model = WhisperModel(
+                "small", device="cpu", compute_type="auto", cpu_threads=os.cpu_count() or 0,
+            )
     return _whisper_model
 
 
@@ -185,7 +630,13 @@ def transcribe_audio(audio_path: str, language: str) -> list:
     """Run Whisper on extracted audio. Returns list of {start, end, text} segments."""
     model = _get_whisper_model()
     whisper_lang = "hi" if language == "hinglish" else "en"
-    segments, _ = model.transcribe(audio_path, language=whisper_lang, beam_size=3)
+    segments, _ = model.transcribe(
+        audio_path,
+        language=whisper_lang,
+        beam_size=WHISPER_BEAM_SIZE,
+        vad_filter=True,  # skip silent stretches instead of decoding them
+        vad_parameters={"min_silence_duration_ms": 500},
+    )
     result = []
     for seg in segments:
         text = seg.text.strip()
@@ -204,6 +655,15 @@ def compare_captions(frame_results: list, audio_segments: list, language: str) -
     For English: auto-flag mismatches using fuzzy matching.
     For Hinglish: always show side-by-side for human review (scripts differ).
     """
+    # Columnar view of frames with usable text, sorted by time, so each audio
+    # segment finds its window with two binary searches instead of a full scan
+    timestamps, texts = [], []
+    for frame in sorted(frame_results, key=lambda f: f.get("timestamp_sec", 0)):
+        text = frame.get("text") or ""
+        if text and text.lower() not in ("null", "none"):
+            timestamps.append(frame.get("timestamp_sec", 0))
+            texts.append(text)
+
     rows = []
     for seg in audio_segments:
         start, end, spoken = seg["start"], seg["end"], seg["text"]
@@ -211,19 +671,15 @@ def compare_captions(frame_results: list, audio_segments: list, language: str) -
             continue
 
         # Find on-screen text from frames whose timestamp falls in this segment (±2s buffer)
-        on_screen_parts = []
-        for frame in frame_results:
-            ft = frame.get("timestamp_sec", 0)
-            if (start - 2) <= ft <= (end + 2):
-                text = frame.get("text") or ""
-                if text and text.lower() not in ("null", "none"):
-                    on_screen_parts.append(text)
+        lo = bisect.bisect_left(timestamps, start - 2)
+        hi = bisect.bisect_right(timestamps, end + 2)
+        on_screen_parts = texts[lo:hi]
 
         on_screen = " | ".join(dict.fromkeys(on_screen_parts))  # deduplicate, preserve order
         ts = f"{int(start // 60)}:{int(start % 60):02d}"
 
         if language == "english":
-            ratio = difflib.SequenceMatcher(None, spoken.lower(), on_screen.lower()).ratio() if on_screen else 0
+            ratio = fuzz.ratio(spoken.lower(), on_screen.lower()) / 100.0 if on_screen else 0.0
             if on_screen:
                 if ratio >= 0.55:
                     status = "match"
@@ -262,109 +718,237 @@ def format_timestamp(seconds: int) -> str:
 # Background job
 # ──────────────────────────────────────────────
 
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _release_after(path: str, uses: int):
+    """Return a callback that deletes ``path`` on its ``uses``-th call."""
+    lock = threading.Lock()
+    remaining = [uses]
+
+    def release():
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        _remove_quietly(path)
+
+    return release
+
+
+def _transcribe_video(video_path: str, audio_path: str, language: str, release_video) -> list:
+    """Extract the audio track and transcribe it with Whisper."""
+    try:
+        extract_audio(video_path, audio_path)
+    finally:
+        release_video()
+    try:
+        return transcribe_audio(audio_path, language)
+    finally:
+        _remove_quietly(audio_path)
+
+
+def _raise_if_failed(future) -> None:
+    """Re-raise a finished background task's exception so the job fails fast."""
+    if future.done() and future.exception() is not None:
+        raise future.exception()
+
+
+def _analyse_video_frames(job_id: str, video_path: str, language: str, release_video, audio_future):
+    """
+    Extract frames and run them through Ollama. Returns (frame results, unique
+    errors, transcript, frame count). Aborts as soon as `audio_future` fails,
+    so a broken audio track doesn't cost a full run of frame requests.
+    """
+    # ── Step 3: Extract frames
+    jobs.update(job_id, progress={"step": "Extracting video frames…", "pct": 12, "phase": "frames"})
+    try:
+        frames = extract_frames(video_path)
+    finally:
+        release_video()
+
+    if not frames:
+        raise RuntimeError("Could not extract any frames. Is this a valid video file?")
+
+    # Consecutive frames often show the same caption — only analyse frames
+    # that look different from the last analysed one, and of those only the
+    # ones that appear to contain text at all
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+        sources = dedupe_frames(list(pool.map(frame_signature, frames)))
+        distinct = sorted(set(sources))
+        has_text = list(pool.map(probably_has_text, [frames[i] for i in distinct]))
+    unique = [i for i, keep in zip(distinct, has_text) if keep]
+
+    jobs.update(job_id, progress={
+        "step": f"Extracted {len(frames)} frames ({len(unique)} to analyse) — starting AI analysis…",
+        "pct": 15,
+        "phase": "frames",
+    })
+
+    # Encode every analysed frame once, in parallel, before any Ollama call needs it
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+        frames_b64 = list(pool.map(encode_frame, [frames[i] for i in unique]))
+
+    # ── Step 4: Analyse frames
+    _raise_if_failed(audio_future)
+    # Frames the pre-filter judged textless get an empty result without a call
+    analysed = {
+        i: {"text": None, "errors": [], "timestamp_sec": round((i + 1) / FRAME_FPS), "frame_index": i + 1}
+        for i, keep in zip(distinct, has_text) if not keep
+    }
+
+    futures = {
+        _ANALYZE_POOL.submit(analyze_frame, image_b64, i + 1, language=language): i
+        for i, image_b64 in zip(unique, frames_b64)
+    }
+    try:
+        for done, fut in enumerate(as_completed(futures), start=1):
+            _raise_if_failed(audio_future)
+            analysed[futures[fut]] = fut.result()
+            jobs.update(job_id, progress={
+                "step":         f"Analysing frame {done} of {len(unique)}…",
+                "pct":          15 + int((done / len(unique)) * 72),
+                "frames_done":  done,
+                "total_frames": len(unique),
+                "phase":        "analyse",
+            })
+    finally:
+        # Don't leave a failed job's remaining frames queued ahead of other jobs
+        for fut in futures:
+            fut.cancel()
+
+    # One pass over the timeline: expand skipped frames (they reuse the result
+    # of the frame they duplicate), collect unique errors and the transcript
+    all_frames = []
+    all_errors = []
+    transcript = []
+    seen_words = set()
+    for i, src in enumerate(sources):
+        result = analysed[src]
+        if i != src:
+            result = {**result, "frame_index": i + 1, "timestamp_sec": round((i + 1) / FRAME_FPS)}
+        all_frames.append(result)
+
+        text = result.get("text")
+        errors = result.get("errors")
+        if not (text or errors):
+            continue
+        timestamp = format_timestamp(result["timestamp_sec"])
+        if text:
+            transcript.append({
+                "timestamp":     timestamp,
+                "timestamp_sec": result["timestamp_sec"],
+                "text":          text,
+            })
+        for err in errors or ():
+            key = err.get("word", "").lower()
+            if key and key not in seen_words:
+                seen_words.add(key)
+                all_errors.append({
+                    "word":          err["word"],
+                    "suggestion":    err.get("suggestion", ""),
+                    "context":       err.get("context", text),
+                    "timestamp_sec": result["timestamp_sec"],
+                    "timestamp":     timestamp,
+                })
+
+    return all_frames, all_errors, transcript, len(frames)
+
+
 def process_video(job_id: str, video_path: str, language: str):
-    job = jobs[job_id]
-    output_dir = f"/tmp/frames_{job_id}"
     audio_path = f"/tmp/audio_{job_id}.wav"
 
     try:
-        job["status"] = "processing"
+        jobs.update(job_id, status="processing")
 
         # ── Step 1: Verify Ollama is reachable
         try:
-            requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
+            _SESSION.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
         except Exception:
             raise RuntimeError(
                 f"Cannot reach Ollama at {OLLAMA_BASE_URL}. "
                 "Make sure Ollama is running and the model is loaded."
             )
+        _ANALYZE_POOL.submit(warm_up_model)
+
+        # ── Step 2: Extract audio + transcribe — runs in the background while
+        # frames are extracted and analysed, since the two are independent.
+        # The upload is deleted as soon as both ffmpeg passes have read it.
+        jobs.update(job_id, progress={"step": "Transcribing audio with Whisper…", "pct": 3, "phase": "audio"})
+        release_video = _release_after(video_path, 2)
+        with ThreadPoolExecutor(max_workers=1) as audio_pool:
+            audio_future = audio_pool.submit(_transcribe_video, video_path, audio_path, language, release_video)
+            all_frames, all_errors, transcript, total_frames = _analyse_video_frames(
+                job_id, video_path, language, release_video, audio_future
+            )
 
-        # ── Step 2: Extract audio + transcribe
-        job["progress"] = {"step": "Extracting audio from video…", "pct": 3, "phase": "audio"}
-        extract_audio(video_path, audio_path)
-
-        job["progress"] = {"step": "Transcribing audio with Whisper…", "pct": 7, "phase": "audio"}
-        audio_segments = transcribe_audio(audio_path, language)
-
-        # ── Step 3: Extract frames
-        job["progress"] = {"step": "Extracting video frames…", "pct": 12, "phase": "frames"}
-        frames = extract_frames(video_path, output_dir)
-
-        if not frames:
-            raise RuntimeError("Could not extract any frames. Is this a valid video file?")
-
-        job["progress"] = {
-            "step": f"Extracted {len(frames)} frames — starting AI analysis…",
-            "pct": 15,
-            "phase": "frames",
-        }
-
-        # ── Step 4: Analyse frames
-        all_frames = []
-        all_errors = []
-        seen_words = set()
-
-        for i, frame_path in enumerate(frames):
-            pct = 15 + int((i / len(frames)) * 72)
-            job["progress"] = {
-                "step":         f"Analysing frame {i + 1} of {len(frames)}…",
-                "pct":          pct,
-                "frames_done":  i + 1,
-                "total_frames": len(frames),
-                "phase":        "analyse",
-            }
-
-            result = analyze_frame(str(frame_path), i + 1, language=language)
-            all_frames.append(result)
-
-            if result.get("errors"):
-                for err in result["errors"]:
-                    key = err.get("word", "").lower()
-                    if key and key not in seen_words:
-                        seen_words.add(key)
-                        all_errors.append({
-                            "word":          err["word"],
-                            "suggestion":    err.get("suggestion", ""),
-                            "context":       err.get("context", result.get("text", "")),
-                            "timestamp_sec": result["timestamp_sec"],
-                            "timestamp":     format_timestamp(result["timestamp_sec"]),
-                        })
+            if not audio_future.done():
+                jobs.update(job_id, progress={"step": "Finishing audio transcription…", "pct": 88, "phase": "analyse"})
+            audio_segments = audio_future.result()
 
         # ── Step 5: Compare captions
-        job["progress"] = {"step": "Comparing captions against audio…", "pct": 90, "phase": "compare"}
+        jobs.update(job_id, progress={"step": "Comparing captions against audio…", "pct": 90, "phase": "compare"})
         caption_accuracy = compare_captions(all_frames, audio_segments, language)
 
         # ── Step 6: Done
-        job["status"]   = "done"
-        job["progress"] = {"step": "Analysis complete!", "pct": 100, "phase": "done"}
-        job["results"]  = {
+        results = {
             "language":        language,
-            "total_frames":    len(frames),
-            "frames_with_text": sum(1 for f in all_frames if f.get("text")),
+            "total_frames":    total_frames,
+            "frames_with_text": len(transcript),
             "errors":          all_errors,
-            "transcript": [
-                {
-                    "timestamp":     format_timestamp(f["timestamp_sec"]),
-                    "timestamp_sec": f["timestamp_sec"],
-                    "text":          f["text"],
-                }
-                for f in all_frames if f.get("text")
-            ],
+            "transcript":      transcript,
             "audio_transcript":  audio_segments,
             "caption_accuracy":  caption_accuracy,
         }
+        jobs.update(
+            job_id,
+            status="done",
+            progress={"step": "Analysis complete!", "pct": 100, "phase": "done"},
+            results=results,
+        )
 
     except Exception as exc:
-        job["status"] = "error"
-        job["error"]  = str(exc)
+        jobs.update(job_id, status="error", error=str(exc))
 
     finally:
-        shutil.rmtree(output_dir, ignore_errors=True)
-        for path in (video_path, audio_path):
-            try:
-                os.remove(path)
-            except OSError:
-                pass
+        # Normally already gone; covers jobs that failed before extraction
+        _remove_quietly(video_path)
+        _remove_quietly(audio_path)
+
+
+# Jobs run on a bounded pool so simultaneous uploads queue up instead of all
+# competing for Whisper and Ollama at once (per app process)
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", "2"))
+_JOB_POOL = ThreadPoolExecutor(max_workers=JOB_CONCURRENCY, thread_name_prefix="job")
+_jobs_in_flight = 0
+_jobs_in_flight_lock = threading.Lock()
+
+
+def _job_finished(_future) -> None:
+    global _jobs_in_flight
+    with _jobs_in_flight_lock:
+        _jobs_in_flight -= 1
+
+
+def submit_job(job_id: str, video_path: str, language: str) -> None:
+    """Register a job and queue it on the job pool, with an estimate of its queue position."""
+    global _jobs_in_flight
+    with _jobs_in_flight_lock:
+        ahead = _jobs_in_flight - JOB_CONCURRENCY + 1
+        _jobs_in_flight += 1
+
+    step = f"Queued — position {ahead} in line…" if ahead > 0 else "Queued…"
+    jobs.create(job_id, {
+        "status":   "queued",
+        "progress": {"step": step, "pct": 0, "queue_position": max(ahead, 0)},
+        "results":  None,
+        "error":    None,
+    })
+    _JOB_POOL.submit(process_video, job_id, video_path, language).add_done_callback(_job_finished)
 
 
 # ──────────────────────────────────────────────
@@ -376,6 +960,12 @@ def index():
     return render_template("index.html")
 
 
+def _save_upload(file, path: str) -> None:
+    """Copy the upload to disk in 1 MB chunks (FileStorage.save uses 16 KB)."""
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file.stream, out, length=1024 * 1024)
+
+
 @app.route("/upload", methods=["POST"])
 def upload():
     if "video" not in request.files:
@@ -388,32 +978,55 @@ def upload():
     language  = request.form.get("language", "english").lower()
     job_id    = str(uuid.uuid4())
     video_path = f"/tmp/video_{job_id}"
-    file.save(video_path)
+    _save_upload(file, video_path)
 
-    jobs[job_id] = {
-        "status":   "queued",
-        "progress": {"step": "Queued…", "pct": 0},
-        "results":  None,
-        "error":    None,
-    }
-
-    t = threading.Thread(target=process_video, args=(job_id, video_path, language), daemon=True)
-    t.start()
+    submit_job(job_id, video_path, language)
 
     return jsonify({"job_id": job_id})
 
 
-@app.route("/status/<job_id>")
-def status(job_id):
-    if job_id not in jobs:
-        return jsonify({"error": "Job not found."}), 404
-    job = jobs[job_id]
-    return jsonify({
+def _status_payload(job: dict) -> dict:
+    return {
         "status":   job["status"],
         "progress": job["progress"],
-        "results":  job.get("results"),
+        "results":  job.get("results") if job["status"] == "done" else None,
         "error":    job.get("error"),
-    })
+    }
+
+
+@app.route("/status/<job_id>")
+def status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found."}), 404
+    # The store bumps "version" on every update, so it doubles as an ETag:
+    # a poll that repeats it gets a bodiless 304 instead of the full results.
+    resp = jsonify(_status_payload(job))
+    resp.set_etag(str(job["version"]))
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
+
+
+@app.route("/status/<job_id>/stream")
+def status_stream(job_id):
+    """Server-Sent Events: push a status payload whenever the job changes."""
+    if jobs.get(job_id) is None:
+        return jsonify({"error": "Job not found."}), 404
+
+    def events():
+        for job in jobs.watch(job_id):
+            if job is None:
+                yield b": keep-alive\n\n"
+                continue
+            yield b"data: " + orjson.dumps(_status_payload(job)) + b"\n\n"
+            if job["status"] in FINISHED_STATUSES:
+                return
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ──────────────────────────────────────────────
@@ -38,9 +38,12 @@ echo "⏳  Building custom model 'video-spellcheck' from Modelfile…"
 ollama create video-spellcheck -f "$SCRIPT_DIR/Modelfile"
 echo "✅  Model 'video-spellcheck' ready"
 
-# 4. Start Ollama in background if not already running
+# 4. Start Ollama in background if not already running.
+#    The app sends OLLAMA_NUM_PARALLEL frames at once, so let the server
+#    process that many requests in parallel too.
+export OLLAMA_NUM_PARALLEL="${OLLAMA_NUM_PARALLEL:-4}"
 if ! curl -s http://localhost:11434/api/tags &>/dev/null; then
-  echo "⏳  Starting Ollama…"
+  echo "⏳  Starting Ollama (OLLAMA_NUM_PARALLEL=$OLLAMA_NUM_PARALLEL)…"
   ollama serve &>/tmp/ollama.log &
   sleep 3
 fi
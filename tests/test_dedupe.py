@@ -0,0 +1,72 @@
+import io
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app import dedupe_frames, frame_signature
+
+_rng = np.random.default_rng(0)
+_yy, _xx = np.mgrid[0:630, 0:1120]
+_BACKGROUND = (120 + 60 * np.sin(_xx / 90.0) + 40 * np.cos(_yy / 70.0)).clip(0, 255)
+
+
+def _frame(caption: str) -> bytes:
+    """A 1120x630 JPEG: the same background with a little sensor noise and a
+    captioned black lower third."""
+    gray = (_BACKGROUND + _rng.normal(0, 4, _BACKGROUND.shape)).clip(0, 255).astype(np.uint8)
+    img = Image.fromarray(np.dstack([gray, gray // 2 + 40, 255 - gray]))
+
+    strip = Image.new("RGB", (373, 36), "black")
+    ImageDraw.Draw(strip).text((4, 10), caption, fill="white", font=ImageFont.load_default())
+    img.paste(strip.resize((1120, 108), Image.NEAREST), (0, 522))
+
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=75)
+    return buf.getvalue()
+
+
+def _sources(*captions: str) -> list:
+    return dedupe_frames([frame_signature(_frame(c)) for c in captions])
+
+
+class DedupeFramesTest(unittest.TestCase):
+    def test_different_captions_on_same_background_are_all_analysed(self):
+        self.assertEqual(
+            _sources(
+                "Welcome back to the channel",
+                "Today we recieve a new update",
+                "Lets talk about the goverment",
+            ),
+            [0, 1, 2],
+        )
+
+    def test_one_letter_change_is_not_reused(self):
+        self.assertEqual(
+            _sources("Today we recieve a new update", "Today we receive a new update"),
+            [0, 1],
+        )
+
+    def test_later_frame_with_same_phash_but_new_text_is_not_reused(self):
+        misspelled = frame_signature(_frame("Today we recieve a new update"))
+        corrected = frame_signature(_frame("Today we receive a new update"))
+        self.assertEqual(misspelled[0] - corrected[0], 0)  # the pHash can't tell them apart
+
+        other = frame_signature(_frame("Welcome back to the channel"))
+        self.assertEqual(dedupe_frames([misspelled, other, corrected]), [0, 1, 2])
+        self.assertEqual(dedupe_frames([corrected, other, misspelled]), [0, 1, 2])
+
+    def test_repeated_caption_reuses_earlier_frame(self):
+        self.assertEqual(
+            _sources(
+                "Welcome back to the channel",
+                "Welcome back to the channel",
+                "Today we recieve a new update",
+                "Welcome back to the channel",
+            ),
+            [0, 0, 2, 0],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()